@@ -4,12 +4,13 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
+import plotly
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from collections import namedtuple
 import yfinance as yf
 import warnings
-warnings.filterwarnings("ignore")
+warnings.filterwarnings("ignore", module="yfinance")
 
 # ==================== PAGE CONFIG ====================
 st.set_page_config(
@@ -46,22 +47,62 @@ PAIRS = [
     ("2026-03-18", "2026-04-25"),
 ]
 
-pairs = [(datetime.strptime(s, "%Y-%m-%d").date(), datetime.strptime(i, "%Y-%m-%d").date()) for s, i in PAIRS]
+pairs = [(date.fromisoformat(s), date.fromisoformat(i)) for s, i in PAIRS]
 
 # ==================== FETCH PRICE DATA ====================
+MAX_HISTORY = 50  # symbols kept in price_history
+
+@st.cache_resource
+def price_history():
+    # symbol -> (day of last full download, frame) - survives the hourly get_data expiry
+    return {}
+
+def download(symbol, **kwargs):
+    try:
+        return yf.download(symbol, progress=False, **kwargs)
+    except Exception:
+        return None
+
+def date_rows(data):
+    # date -> (first row, last row + 1); the index is sorted, so a date's rows are contiguous
+    rows = {}
+    for i, d in enumerate(data.index.date):
+        rows[d] = (rows[d][0] if d in rows else i, i + 1)
+    return rows
+
 @st.cache_data(ttl=3600)
 def get_data(symbol):
-    try:
-        data = yf.download(symbol, period="3y", progress=False)
-        if data.empty:
-            st.error("Invalid ticker! Try: IDBI.NS, RELIANCE.NS, HDFCBANK.NS, ^NSEI")
-            st.stop()
-        return data
-    except:
+    history = price_history()
+    today = datetime.now().date()
+    fetched, prev = history.pop(symbol, (None, None))
+    if fetched == today:
+        # Split/dividend adjustments only change between sessions, so bars
+        # appended within the same day share the stored frame's price scale
+        new = download(symbol, start=prev.index[-1].date())
+        data = prev
+        if new is not None and not new.empty:
+            data = pd.concat([prev, new])
+            data = data[~data.index.duplicated(keep="last")]
+            data = data.loc[data.index[-1] - pd.DateOffset(years=3):]
+    else:
+        # First fetch of the day: rebuild the whole 3y frame on the new scale
+        data = download(symbol, period="3y")
+        if data is not None and not data.empty:
+            fetched = today
+        elif prev is not None:
+            data = prev  # keep serving the old frame, retry the full fetch next refresh
+    if data is None:
         st.error("Yahoo Finance temporary block. Wait 60 seconds and refresh.")
         st.stop()
+    if data.empty:
+        st.error("Invalid ticker! Try: IDBI.NS, RELIANCE.NS, HDFCBANK.NS, ^NSEI")
+        st.stop()
+    if len(history) >= MAX_HISTORY:
+        history.pop(next(iter(history)))  # drop the least recently fetched symbol
+    history[symbol] = (fetched, data)
+    return data, date_rows(data)
 
-df = get_data(ticker)
+df, date_to_rows = get_data(ticker)
 current_price = round(df['Close'].iloc[-1], 2)
 current_date = df.index[-1].date()
 
@@ -94,16 +135,18 @@ else:
 sup_date, inf_date = active_pair
 
 # ==================== GET PRICE RANGES ====================
-def get_range(date):
-    for d in [date + timedelta(days=x) for x in [-1, 0, 1]]:
-        mask = df.index.date == d
-        if mask.any():
-            day = df[mask]
-            return {
-                'high': day['High'].max(),
-                'low': day['Low'].min(),
-                'close': day['Close'].iloc[-1]
-            }
+PriceRange = namedtuple("PriceRange", ["high", "low", "close"])
+highs, lows, closes = df['High'].values, df['Low'].values, df['Close'].values
+
+def get_range(d):
+    for delta in (-1, 0, 1):
+        span = date_to_rows.get(d + timedelta(days=delta))
+        if span is not None:
+            lo, hi = span
+            if hi - lo == 1:
+                return PriceRange(highs[lo], lows[lo], closes[lo])
+            # Several bars on one day - reduce over all of them
+            return PriceRange(highs[lo:hi].max(), lows[lo:hi].min(), closes[hi - 1])
     return None
 
 range1 = get_range(sup_date)
@@ -120,41 +163,55 @@ st.markdown("---")
 st.subheader(f"**{mode}**")
 
 # ==================== PLOT ====================
-fig = go.Figure()
-fig.add_trace(go.Candlestick(
-    x=df.index[-180:],
-    open=df['Open'][-180:], high=df['High'][-180:],
-    low=df['Low'][-180:], close=df['Close'][-180:],
-    name=ticker
-))
-
-fig.add_vline(x=pd.Timestamp(sup_date), line=dict(color="#FFD700", width=4, dash="dash"),
-              annotation_text="Superior #1", annotation_position="top left")
-fig.add_vline(x=pd.Timestamp(inf_date), line=dict(color="#DC143C", width=4, dash="dash"),
-              annotation_text="Inferior #2", annotation_position="top left")
-
-if range1:
-    fig.add_hrect(y0=range1['low'], y1=range1['high'],
-                  fillcolor="#FFD700", opacity=0.2, line_width=0,
-                  annotation_text=f"TARGET ZONE ₹{range1['low']:.1f}–₹{range1['high']:.1f}")
-
-fig.update_layout(height=600, title=f"{ticker} - Universal Clock™ Mercury/Sun")
+# plotly >= 6 ships numpy arrays as base64 typed arrays; plotly 5 writes JSON
+# lists, where float32 prints as long decimals and the payload grows
+PLOTLY_TYPED_ARRAYS = int(plotly.__version__.split(".")[0]) >= 6
+
+# Keyed on the last bar and the zone so reruns from unrelated widgets skip
+# rebuilding the traces (st.plotly_chart still serializes it every rerun)
+@st.cache_data(ttl=3600, max_entries=100, show_spinner=False)
+def build_fig(_df, ticker, sup, inf, last_date, last_close, low, high):
+    ohlc = _df[['Open', 'High', 'Low', 'Close']].iloc[-180:]
+    if PLOTLY_TYPED_ARRAYS:
+        # float32 is plenty for 2-decimal prices and halves the OHLC arrays
+        ohlc = ohlc.astype('float32')
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(
+        x=ohlc.index.values,
+        open=ohlc['Open'].values, high=ohlc['High'].values,
+        low=ohlc['Low'].values, close=ohlc['Close'].values,
+        name=ticker
+    ))
+
+    fig.add_vline(x=pd.Timestamp(sup), line=dict(color="#FFD700", width=4, dash="dash"),
+                  annotation_text="Superior #1", annotation_position="top left")
+    fig.add_vline(x=pd.Timestamp(inf), line=dict(color="#DC143C", width=4, dash="dash"),
+                  annotation_text="Inferior #2", annotation_position="top left")
+
+    if low is not None:
+        fig.add_hrect(y0=low, y1=high,
+                      fillcolor="#FFD700", opacity=0.2, line_width=0,
+                      annotation_text=f"TARGET ZONE ₹{low:.1f}–₹{high:.1f}")
+
+    fig.update_layout(height=600, title=f"{ticker} - Universal Clock™ Mercury/Sun")
+    return fig.to_dict()
+
+fig = build_fig(df, ticker, sup_date, inf_date, current_date, current_price,
+                range1.low if range1 else None, range1.high if range1 else None)
 st.plotly_chart(fig, use_container_width=True)
 
 # ==================== RESULT & ACCURACY ====================
 if range1 and range2:
-    overlap = max(range1['low'], range2['low']) <= min(range1['high'], range2['high'])
-    overlap_pct = 0
-    if overlap:
-        ol = min(range1['high'], range2['high']) - max(range1['low'], range2['low'])
-        overlap_pct = (ol / (range1['high'] - range1['low'])) * 100
+    ol = min(range1.high, range2.high) - max(range1.low, range2.low)
+    overlap = ol >= 0
+    overlap_pct = (ol / (range1.high - range1.low)) * 100 if overlap else 0
 
     if overlap:
         st.success(f"METHOD WORKED! Overlap: {overlap_pct:.1f}%")
     else:
         st.warning("No overlap (very rare - 5.6%)")
 
-    low, high = range1['low'], range1['high']
+    low, high = range1.low, range1.high
 
     # ==================== TRADE PLANS ====================
     st.markdown("### Trade Plans (Jeanne Long Rules)")
@@ -183,9 +240,13 @@ if range1 and range2:
         st.write("**Next 3 Future Predictions**")
         future = [p for p in pairs if p[0] > today]
         for s, i in future[:3]:
+            if s > current_date + timedelta(days=1):
+                # No bars yet - get_range's -1 day offset can still hit the last bar
+                st.write(f"**{s} → {i}** → (pending)")
+                continue
             r = get_range(s)
             if r:
-                st.write(f"**{s} → {i}** → ₹{r['low']:.1f}–₹{r['high']:.1f}")
+                st.write(f"**{s} → {i}** → ₹{r.low:.1f}–₹{r.high:.1f}")
 
 else:
     st.info("Future pair - price will hit this zone by Inferior date")
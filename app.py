@@ -1,8 +1,9 @@
 import streamlit as st
 import yfinance as yf
 import pandas as pd
+import plotly
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 st.set_page_config(page_title="Universal Clock™ - Jeanne Long", layout="wide")
 st.title("🕰️ Universal Clock™ - Jeanne Long (Book 1)")
@@ -14,7 +15,7 @@ PAIRS = [
     ("2025-05-30", "2025-07-29"), ("2025-09-13", "2025-11-20"),
     ("2025-12-30", "2026-02-06")
 ]
-pairs = [(datetime.strptime(s,"%Y-%m-%d").date(), datetime.strptime(i,"%Y-%m-%d").date()) for s,i in PAIRS]
+pairs = [(date.fromisoformat(s), date.fromisoformat(i)) for s,i in PAIRS]
 
 col1, col2 = st.columns([3,1])
 ticker = col1.text_input("Stock (e.g. IDBI.NS)", "IDBI.NS").upper()
@@ -22,9 +23,14 @@ if not ticker.endswith(".NS"): ticker += ".NS"
 hist_date = col2.date_input("Historical date (or today)", datetime.today())
 
 @st.cache_data(ttl=3600)
-def get_data(t): return yf.download(t, period="2y")
+def get_data(t):
+    data = yf.download(t, period="2y")
+    # date -> (first row, last row + 1); the index is sorted, so a date's rows are contiguous
+    rows = {}
+    for i, d in enumerate(data.index.date): rows[d] = (rows[d][0] if d in rows else i, i + 1)
+    return data, rows
 
-df = get_data(ticker)
+df, date_to_rows = get_data(ticker)
 today = datetime.now().date()
 
 # Select pair
@@ -36,12 +42,13 @@ if not pair: pair = pairs[-1]
 sup, inf = pair
 
 # Get range
+highs, lows = df['High'].values, df['Low'].values
 def get_range(d):
-    for delta in [-1,0,1]:
-        mask = df.index.date == d + timedelta(delta)
-        if mask.any(): 
-            day = df[mask]
-            return day['High'].max(), day['Low'].min()
+    for delta in (-1,0,1):
+        span = date_to_rows.get(d + timedelta(delta))
+        if span is not None:
+            lo, hi = span
+            return highs[lo:hi].max(), lows[lo:hi].min()
     return None, None
 
 h1, l1 = get_range(sup)
@@ -51,7 +58,10 @@ st.metric("Current Price", f"₹{curr:.2f}")
 st.write(f"**Superior #1:** {sup} → Range ₹{l1:.1f} – ₹{h1:.1f}")
 st.write(f"**Inferior #2:** {inf} → Price returns here")
 
-fig = go.Figure(data=[go.Candlestick(x=df.index[-200:], open=df['Open'][-200:], high=df['High'][-200:], low=df['Low'][-200:], close=df['Close'][-200:])])
+ohlc = df[['Open','High','Low','Close']].iloc[-200:]
+# float32 halves the OHLC arrays on plotly >= 6 (typed arrays); plotly 5 JSON lists would grow
+if int(plotly.__version__.split(".")[0]) >= 6: ohlc = ohlc.astype('float32')
+fig = go.Figure(data=[go.Candlestick(x=ohlc.index.values, open=ohlc['Open'].values, high=ohlc['High'].values, low=ohlc['Low'].values, close=ohlc['Close'].values)])
 fig.add_vrect(x0=sup, x1=inf, fillcolor="gold", opacity=0.2, line_width=0)
 fig.add_vline(x=pd.Timestamp(sup), line=dict(color="gold", dash="dash"))
 fig.add_vline(x=pd.Timestamp(inf), line=dict(color="red", dash="dash"))